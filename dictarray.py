@@ -21,10 +21,35 @@ atleast_1d = np.atleast_1d
 ndarray = np.ndarray
 concatenate = np.concatenate
 array = np.array
-in1d = np.in1d
-
+asarray = np.asarray
+isin = np.isin
+flatnonzero = np.flatnonzero
+add = np.char.add
+mod = np.char.mod
+ljust = np.char.ljust
+rjust = np.char.rjust
+rstrip = np.char.rstrip
+str_len = np.char.str_len
+
+from operator import itemgetter
 from fileio import dictarrayreader, isfileobj
-from matplotlib.mlab import rec2txt
+
+
+_iterdicts = dict()
+
+
+def _make_iterdicts(names):
+    """ generates an iterdicts function spelling out the dict literal for
+        the given field names, e.g. {'a': row[0], 'b': row[1]}
+    """
+    if names not in _iterdicts:
+        items = ', '.join(['%r: row[%d]' % (n, i) for i, n in enumerate(names)])
+        source = ('def iterdicts(rec):\n'
+                  '    return ({%s} for row in rec.ravel())\n' % items)
+        namespace = dict()
+        exec(source, namespace)
+        _iterdicts[names] = namespace['iterdicts']
+    return _iterdicts[names]
 
 
 def iterdicts(rec):
@@ -34,7 +59,7 @@ def iterdicts(rec):
     >>> [r for r in iterdicts(dictarray([1,2]))]
     [{'f0': 1, 'f1': 2}]
     """
-    return (dict(zip(*(rec.dtype.names, ii))) for ii in rec.ravel())
+    return _make_iterdicts(rec.dtype.names or ())(rec)
 
 
 def iteritems(rec):
@@ -44,12 +69,57 @@ def iteritems(rec):
     >>> [r for r in iteritems(dictarray([1,2]))]
     [('f0', array([1])), ('f1', array([2]))]
     """
-    if rec.dtype.names:
-        return ((n, rec[n]) for n in rec.dtype.names)
+    names = rec.dtype.names
+    if names:
+        return iter([(n, rec[n]) for n in names])
     else:
         return iter([])
 
 
+def itemindex(rec, **kwargs):
+    """ indices of the records matching any of the given field values, rec
+        only needs to provide len() and field()
+    >>> d = dictarray({'a': [1, 3, 5], 'b': [2, 4, 6]})
+    >>> itemindex(d, a=5)
+    (array([2]),)
+    >>> itemindex(d, a=[5, 1], b=2)
+    (array([0, 2]),)
+    """
+    mask = np.zeros(len(rec), dtype=bool)
+    for key, val in kwargs.items():
+        mask |= isin(rec.field(key).ravel(), atleast_1d(val))
+    return (flatnonzero(mask),)
+
+
+def rec2txt(rec, padding=3, precision=4):
+    """ formats the records as a text table with a header line, numbers are
+        right and everything else left justified
+    >>> print rec2txt(dictarray({'a': ['x', 'yz'], 'b': [1.5, 2]}, names='a,b'))
+       a         b
+       x    1.5000
+       yz   2.0000
+    """
+    fmt = '%.{p}f'.format(p=precision)
+    table = None
+    for name in rec.dtype.names:
+        col = rec[name].ravel()
+        kind = col.dtype.kind
+        if kind == 'f':
+            cells = mod(fmt, col)
+        elif kind in 'iu':
+            cells = mod('%d', col)
+        else:
+            cells = col.astype(str)
+        cells = concatenate((array([name]), cells)).astype(str)
+        width = str_len(cells).max()
+        if kind in 'iuf':
+            cells = rjust(cells, width + padding)
+        else:
+            cells = add(' ' * padding, ljust(cells, width))
+        table = cells if table is None else add(table, cells)
+    return '\n'.join(rstrip(table))
+
+
 class DictArray(recarray):
     """
     >>> d = DictArray(shape=(0,), dtype='V4')
@@ -92,13 +162,7 @@ class DictArray(recarray):
         return iterdicts(self)
 
     def itemindex(self, **kwargs):
-        ids = list()
-        for key, val in kwargs.items():
-            col = self.field(key)
-            val = array(val).ravel()
-            idx = np.nonzero(in1d(col, val))
-            ids.append(idx)
-        return tuple(concatenate(i) for i in zip(*ids))
+        return itemindex(self, **kwargs)
 
     def extract(self, field=None, **kwargs):
         indices = self.itemindex(**kwargs)
@@ -108,6 +172,28 @@ class DictArray(recarray):
         return bool(self.itemindex(**kwargs))
 
 
+# number of dtypes kept by _build_dtype before its cache is emptied
+DTYPE_CACHE_SIZE = 256
+_dtypes = dict()
+
+# format_parser options a prebuilt dtype would silently drop
+_parser_options = set(['titles', 'aligned', 'byteorder'])
+
+
+def _build_dtype(names, formats):
+    """ record dtype for a tuple of names and a tuple of formats, cached so
+        that recurring pairs skip numpy's format parsing
+    >>> _build_dtype(('a', 'b'), ('f4', 'i4'))
+    dtype([('a', '<f4'), ('b', '<i4')])
+    """
+    key = (names, formats)
+    if key not in _dtypes:
+        if len(_dtypes) >= DTYPE_CACHE_SIZE:
+            _dtypes.clear()
+        _dtypes[key] = np.dtype(zip(names, formats))
+    return _dtypes[key]
+
+
 def readdictarray(*args, **kwargs):
     try:
         read = dictarrayreader(*args, **kwargs)
@@ -167,10 +253,10 @@ def dictarray(obj=None, **kwargs):
             else:
                 kwargs.update({'dtype': 'V4'})
 
-    # iterables of dicts to dicts of lists
+    # iterables of dicts to dicts of column arrays
     elif isinstance(obj, (list, tuple)) \
             and isinstance(obj[0], dict):
-        obj = dict([(n, [d[n] for d in obj])
+        obj = dict([(n, array(map(itemgetter(n), obj)))
                     for n in obj[0].keys()])
 
     # dicts of lists to (names and lists of tuples)
@@ -186,9 +272,15 @@ def dictarray(obj=None, **kwargs):
         else:
             names = knames
             kwargs.update(names=names)
-        # create records out of tuple of cols
-        if all(map(lambda v: isinstance(v, (list, tuple)), val)):
-            obj = zip(*val)
+        # create records column wise out of tuple of cols
+        if all(map(lambda v: isinstance(v, (list, tuple, ndarray)), val)):
+            obj = [asarray(v) for v in val]
+            if not dtype and 'formats' not in kwargs \
+                    and not set(kwargs) & _parser_options \
+                    and all(c.ndim == 1 for c in obj):
+                kwargs.pop('names', None)
+                kwargs.update(dtype=_build_dtype(
+                    tuple(map(str, names)), tuple(c.dtype.str for c in obj)))
         else:  # if dictionary values are scalars
             obj = val
 
@@ -202,6 +294,18 @@ def dictarray(obj=None, **kwargs):
         if names:
             obj = obj[names]
 
+    formats = kwargs.get('formats', None)
+    if formats and names and not kwargs.get('dtype') \
+            and not set(kwargs) & _parser_options:
+        if isinstance(formats, str) and '(' not in formats:
+            formats = formats.split(',')
+        if isinstance(formats, (list, tuple)) and len(formats) == len(names):
+            kwargs.pop('formats')
+            kwargs.pop('names', None)
+            kwargs.update(dtype=_build_dtype(
+                tuple(str(n).strip() for n in names),
+                tuple(f.strip() if isinstance(f, str) else f for f in formats)))
+
     a = rarray(obj, **kwargs)
     return atleast_1d(a).view(DictArray)
 
@@ -16,6 +16,8 @@ __version__ = '.'.join(__version_info__)
 
 import numpy as np
 recarray = np.recarray
+ndarray = np.ndarray
+empty = np.empty
 concatenate = np.concatenate
 atleast_1d = np.atleast_1d
 result_type = np.result_type
@@ -25,7 +27,7 @@ unique = np.unique
 vectorize = np.vectorize
 npany = np.any
 
-from dictarray import dictarray, DictArray
+from dictarray import dictarray, DictArray, itemindex, _build_dtype
 from fileio import DictArrayWriter
 
 
@@ -39,7 +41,8 @@ def isempty(arr):
     >>> isempty(dictarray([1,2], names='a,b'))
     False
     """
-    arr = dictarray(arr)
+    if not isinstance(arr, ndarray):
+        arr = dictarray(arr)
     return not bool(arr.size)  # works if empty has shape (0,) not (,)
 
 
@@ -65,21 +68,59 @@ def append(a, b, **kwargs):
     [('a', '<i4'), ('b', '<i4')]
     """
     # TODO: cast according to first of both arrays rather then to a common type
-    arr = dictarray(a)
-    brr = dictarray(b, **kwargs)
+    arr = a if isinstance(a, DictArray) else dictarray(a)
+    brr = b if isinstance(b, DictArray) and not kwargs else dictarray(b, **kwargs)
     if isempty(brr):
-        return arr
+        return arr if arr is not a else arr.copy()  # never hand back an input
     else:
         if isempty(arr):
             if arr.dtype.names:
                 brr = dictarray(b, names=arr.dtype.names)
-            return brr
+            return brr if brr is not b else brr.copy()
         else:
-            dtype = map(lambda n: (n, result_type(arr[n], brr[n])), arr.dtype.names)
-            arr = atleast_1d(arr.astype(dtype, casting='unsafe'))
-            brr = atleast_1d(brr.astype(dtype, casting='unsafe'))
             # TODO: can we use casting='safe' ?
-            return concatenate((arr, brr))
+            return join((arr, brr), promote(arr.dtype, brr.dtype))
+
+
+def join(arrs, dtype):
+    """ concatenates 1d recarrays into one array of the given dtype, copying
+        fields by name straight into a single output buffer
+    >>> print join((dictarray([1,2], names='a,b'), dictarray([4.5,3], names='b,a')), np.dtype([('a', 'f8'), ('b', 'f8')]))
+    [(1.0, 2.0) (3.0, 4.5)]
+    """
+    if all(a.dtype == dtype for a in arrs):
+        return concatenate(arrs)
+    out = np.empty(sum(a.size for a in arrs), dtype=dtype)
+    for n in dtype.names:
+        joincolumn(out[n], [a[n].ravel() for a in arrs])
+    return out
+
+
+def joincolumn(out, chunks):
+    """ copies the chunks one after the other into out, casting unsafely
+        like astype
+    >>> joincolumn(np.empty(3), [array([1, 2]), array([3])])
+    array([ 1.,  2.,  3.])
+    """
+    start = 0
+    for c in chunks:
+        out[start:start + len(c)] = c
+        start += len(c)
+    return out
+
+
+def promote(adtype, bdtype):
+    """ common parent type of two record dtypes, fields ordered as in the
+        first one. The result comes from the cached _build_dtype
+    >>> promote(dictarray([1,2], names='a,b').dtype, dictarray([4.5,3], names='b,a').dtype)
+    dtype([('a', '<i4'), ('b', '<f8')])
+    """
+    if adtype == bdtype:
+        return adtype
+    afields, bfields = adtype.fields, bdtype.fields
+    names = adtype.names
+    return _build_dtype(names, tuple(
+        result_type(afields[n][0], bfields[n][0]) for n in names))
 
 
 class MutableDictArray(object):  # TODO: consider derive from Sequence, or deque
@@ -140,13 +181,31 @@ class MutableDictArray(object):  # TODO: consider derive from Sequence, or deque
     >>> m2.itemindex(a=5)
     (array([2]),)
     >>> m2.itemindex(a=5, b=2)
-    (array([2, 0]),)
+    (array([0, 2]),)
     """
     def __init__(self, obj=None, **kwargs):
         super(MutableDictArray, self).__init__()
         obj = obj.todictarray() if isinstance(obj, MutableDictArray) else obj
         self._data = dictarray(obj=obj, **kwargs)
 
+    def _get_data(self):
+        if self._recs is None:
+            # records are built on demand, the columns then view into them
+            out = empty(self._size, dtype=self._dtype)
+            for n in self._names:
+                joincolumn(out[n], self._cols[n])
+            self._data = out.view(DictArray)
+        return self._recs
+
+    def _set_data(self, arr):
+        self._recs = arr
+        self._size = arr.size
+        self._dtype = arr.dtype
+        self._names = arr.names
+        self._cols = dict((n, [arr.field(n)]) for n in self._names)
+
+    _data = property(_get_data, _set_data)
+
     def __getattr__(self, arg):
         try:
             return self._data.__getattribute__(arg)
@@ -161,10 +220,10 @@ class MutableDictArray(object):  # TODO: consider derive from Sequence, or deque
         return self._data.__getitem__(*arg)
 
     def __len__(self):
-        return len(self._data)
+        return self._size
 
     def __nonzero__(self):
-        return not isempty(self._data)
+        return bool(self._size)
 
     def __iter__(self):
         return iter(self._data)
@@ -177,18 +236,51 @@ class MutableDictArray(object):  # TODO: consider derive from Sequence, or deque
 
     @property
     def names(self):
-        return self._data.names
+        return self._names
+
+    def field(self, name, *val):
+        if val or not isinstance(name, basestring):
+            # field index or setting values, as recarray.field does
+            return self._data.field(name, *val)
+        chunks = self._cols[name]
+        if len(chunks) > 1:
+            # joins the appended chunks in one go rather than on every append
+            col = empty(self._size, dtype=self._dtype.fields[name][0])
+            self._cols[name] = chunks = [joincolumn(col, chunks)]
+        return chunks[0]
+
+    def iterfields(self):
+        return (self.field(n) for n in self._names)
+
+    def fielddict(self):
+        return dict((n, self.field(n)) for n in self._names)
+
+    def itemindex(self, **kwargs):
+        return itemindex(self, **kwargs)
 
     def append(self, obj, **kwargs):
-        new = append(self._data, obj, **kwargs).view(DictArray)
-        self._data = new
+        self._append_owned(dictarray(obj, **kwargs))
+
+    def _append_owned(self, arr):
+        """ appends a DictArray nobody else holds, its fields are kept
+            without a copy until the chunks get joined """
+        if not self._size:
+            self._data = append(self._data, arr).view(DictArray)
+        else:
+            if not isempty(arr):
+                self._dtype = promote(self._dtype, arr.dtype)
+                for n in self._names:
+                    self._cols[n].append(arr.field(n))
+                self._size += arr.size
+                self._recs = None
 
     def todictarray(self):
         return self._data
 
 
 def writedictarray(fileobj, arr, writeheader=False, **kwargs):
-    arr = dictarray(arr, **kwargs)
+    if not isinstance(arr, DictArray) or kwargs:
+        arr = dictarray(arr, **kwargs)
     writer = DictArrayWriter(fileobj, arr.dtype.names)
     if writeheader:
         writer.writeheader()
@@ -222,6 +314,7 @@ class FileDictArray(MutableDictArray):
     def __init__(self, obj=None, **kwargs):
         super(FileDictArray, self).__init__(obj=obj, **kwargs)
         self.file = obj
+        self._writer = None
 
     def __str__(self):
         fname = self.file.name
@@ -240,9 +333,17 @@ class FileDictArray(MutableDictArray):
     def append(self, obj, **kwargs):
         names = self.names if self.names else None
         arr = dictarray(obj, names=names)
-        headerflag = isempty(self)
-        super(FileDictArray, self).append(arr, **kwargs)
-        writedictarray(self.file, arr, writeheader=headerflag)
+        self._append_owned(dictarray(arr, **kwargs) if kwargs else arr)
+
+    def _append_owned(self, arr):
+        headerflag = not self
+        super(FileDictArray, self)._append_owned(arr)
+        if self._writer is None:
+            # names are fixed from here on, so one writer serves all appends
+            self._writer = DictArrayWriter(self.file, arr.dtype.names)
+        if headerflag:
+            self._writer.writeheader()
+        self._writer.writerows(arr.iterdicts())
 
 
 if __name__ == '__main__':
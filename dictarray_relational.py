@@ -23,14 +23,37 @@ concatenate = np.concatenate
 atleast_1d = np.atleast_1d
 format_parser = np.format_parser
 unique = np.unique
-vectorize = np.vectorize
+strip = np.char.strip
+asarray = np.asarray
 in1d = np.in1d
 npany = np.any
+sort = np.sort
+searchsorted = np.searchsorted
+minimum = np.minimum
 
-from dictarray import dictarray
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+from dictarray import dictarray, DictArray
 from dictarray_mutable import MutableDictArray, append, FileDictArray
 
 
+if njit:
+    @njit(cache=True)
+    def _has_duplicates(a):
+        """ hash based check stopping at the first duplicate """
+        seen = set()
+        for v in a:
+            if v in seen:
+                return True
+            seen.add(v)
+        return False
+else:
+    _has_duplicates = None
+
+
 def isrelational(arr, primarykey=None):
     """ checks whether a table is relational, whereas a given name for a
         primarykey checks takes a specific field otherwise it entire records
@@ -58,7 +81,31 @@ def isrelational(arr, primarykey=None):
             arr = arr.field(primarykey)
         else:
             return True
-    return len(unique(arr.ravel())) == len(arr.ravel())
+    arr = arr.ravel()
+    if _has_duplicates and arr.dtype.kind in 'iuf' \
+            and arr.dtype.isnative and arr.dtype.char != 'e':  # no float16
+        return not _has_duplicates(arr)
+    return len(unique(arr)) == len(arr)
+
+
+# above this many value pairs keys are looked up in a sorted copy
+SEARCHSORTED_SIZE = 1 << 12
+
+
+def collides(bval, aval):
+    """ checks whether any of the values in bval exists in aval
+    >>> collides(array([3, 4]), array([1, 2, 3]))
+    True
+    >>> collides(array([4, 5]), array([1, 2, 3]))
+    False
+    """
+    aval, bval = aval.ravel(), bval.ravel()
+    if aval.size * bval.size < SEARCHSORTED_SIZE \
+            or aval.dtype.kind != bval.dtype.kind:
+        return npany(in1d(bval, aval))
+    aval = sort(aval)
+    idx = minimum(searchsorted(aval, bval), aval.size - 1)
+    return npany(aval[idx] == bval)
 
 
 def can_append(a, b, primarykey=None, asstring=False, **kwargs):
@@ -73,21 +120,14 @@ def can_append(a, b, primarykey=None, asstring=False, **kwargs):
     False
     """
     if primarykey:
-        arr = dictarray(a, **kwargs)
-        if arr.names:
-            aval = dictarray(a, **kwargs).field(primarykey)
-        else:
-            aval = array([])
-        brr = dictarray(b, **kwargs)
-        if brr.names:
-            bval = dictarray(b, **kwargs).field(primarykey)
-        else:
-            bval = array([])
+        arr = a if isinstance(a, DictArray) else dictarray(a, **kwargs)
+        aval = arr.field(primarykey) if arr.names else array([])
+        brr = b if isinstance(b, DictArray) else dictarray(b, **kwargs)
+        bval = brr.field(primarykey) if brr.names else array([])
         if asstring:
-            strip = vectorize(lambda x: x.strip())
-            aval = strip([str(v) for v in aval.ravel()])
-            bval = strip([str(v) for v in bval.ravel()])
-        return not npany(in1d(bval, aval)) and isrelational(bval)
+            aval = strip(asarray(aval, dtype=str).ravel())
+            bval = strip(asarray(bval, dtype=str).ravel())
+        return not collides(bval, aval) and isrelational(bval)
     else:
         return True
 
@@ -141,12 +181,17 @@ class RelationalDictArray(MutableDictArray):
         data = super(RelationalDictArray, self).__str__()
         return '\'primarykey: {pkey}\':\n{data}'.format(pkey=self.primarykey, data=data)
 
-    def append(self, obj, **kwargs):
-        arr = dictarray(obj, **kwargs)
-        if self and can_append(self._data, arr, self.primarykey):
-            super(RelationalDictArray, self).append(arr)
-        elif not self and isrelational(arr, self.primarykey):
-            super(RelationalDictArray, self).append(arr)
+    def _append_owned(self, arr):
+        keys = list()
+        if self.primarykey and arr.names:
+            # only the new keys are checked against the ones already stored
+            keys = arr.field(self.primarykey).ravel().tolist()
+            valid = len(set(keys)) == len(keys) and self._pkset.isdisjoint(keys)
+        else:
+            valid = bool(self) or isrelational(arr)
+        if valid:
+            super(RelationalDictArray, self)._append_owned(arr)
+            self._pkset.update(keys)
         else:
             pkey = self.primarykey
             values = '\n'.join([str(v) for v in self[self.primarykey].ravel()])
@@ -170,6 +215,7 @@ class RelationalDictArray(MutableDictArray):
                                           ' as primarykey. Contains none-unique '
                                           'items in {f}'.format(f=self.field(name)))
         self._primarykey = name
+        self._pkset = set(self.field(name).ravel().tolist()) if name and self else set()
 
     primarykey = property(_get_primarykey, _set_primarykey)
 
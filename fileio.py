@@ -15,10 +15,16 @@ __version_info__ = ('1', '0', '0')
 __version__ = '.'.join(__version_info__)
 
 
-from csv import Dialect, register_dialect, DictWriter, QUOTE_MINIMAL
-from tempfile import _TemporaryFileWrapper
-from numpy import genfromtxt
+from csv import Dialect, register_dialect, DictWriter, QUOTE_MINIMAL, QUOTE_NONE
+from numpy import genfromtxt, loadtxt, empty, asarray, char
+from numpy.core.records import fromarrays
 import warnings
+import os
+
+try:
+    from pandas import read_csv
+except ImportError:
+    read_csv = None
 
 # csv.Dialect
 DEFAULT_DELIMITER = '\t'
@@ -36,6 +42,9 @@ DEFAULT_EXTRASACTION = 'raise'
 DEFAULT_DIALECT = 'dictarray'
 DEFAULT_RESTKEY = ['a']
 
+# files larger than this are parsed by pandas' C reader if available
+FAST_READ_SIZE = 1 << 16
+
 
 class DictArrayDialect(Dialect):
     delimiter = DEFAULT_DELIMITER
@@ -81,7 +90,47 @@ def dictarrayreader(*args, **kwargs):
     ...     print dictarrayreader(fileobj)  # doctest: +NORMALIZE_WHITESPACE
     [(1.0, 2) (3.1, 4)]
     >>> os.remove(fname)
+
+    columns with empty cells are kept as text rather than guessed numbers
+    >>> with open(fname, mode='a+') as fileobj:
+    ...     fileobj.write('a\tb\n1\t\n2\t3\n')
+    >>> with open(fname, mode='a+') as fileobj:
+    ...     print dictarrayreader(fileobj)  # doctest: +NORMALIZE_WHITESPACE
+    [(1, '') (2, '3')]
+    >>> os.remove(fname)
+
+    bool columns are recognized and text columns are as wide as they need
+    >>> with open(fname, mode='a+') as fileobj:
+    ...     fileobj.write('a\tb\tc\nTrue\tx\tsome longer text\nFalse\tyz\tc\n')
+    >>> with open(fname, mode='a+') as fileobj:
+    ...     r = dictarrayreader(fileobj)
+    >>> r.dtype.descr
+    [('a', '|b1'), ('b', '|S2'), ('c', '|S16')]
+    >>> os.remove(fname)
+
+    large files read by pandas give the same records, quotes are kept as is
+    >>> with open(fname, mode='a+') as fileobj:
+    ...     w = DictArrayWriter(fileobj, ['a','b'])
+    ...     w.writeheader()
+    ...     w.writerow({'a':'x"y','b':1})
+    ...     w.writerow({'a':'z','b':''})
+    >>> with open(fname, mode='r') as fileobj:
+    ...     slow = dictarrayreader(fileobj)
+    >>> limit = dictarrayreader.__globals__['FAST_READ_SIZE']
+    >>> dictarrayreader.__globals__['FAST_READ_SIZE'] = 0
+    >>> with open(fname, mode='r') as fileobj:
+    ...     fast = dictarrayreader(fileobj)
+    >>> dictarrayreader.__globals__['FAST_READ_SIZE'] = limit
+    >>> fast.dtype == slow.dtype, fast.tolist() == slow.tolist()
+    (True, True)
+    >>> slow.tolist()
+    [('"x""y"', '1'), ('z', '')]
+    >>> os.remove(fname)
     """
+    if len(args) == 1 and not kwargs and hasattr(args[0], 'readline'):
+        if read_csv and _remaining_size(args[0]) > FAST_READ_SIZE:
+            return _readframe(args[0])
+        return _loadrecords(args[0])
     dtype = None
     kwargs.update(dtype=kwargs.get('dtype', dtype),
                   delimiter=kwargs.get('delimiter', DEFAULT_DELIMITER),
@@ -91,9 +140,89 @@ def dictarrayreader(*args, **kwargs):
         return genfromtxt(*args, **kwargs)
 
 
+def _loadrecords(fileobj):
+    """ takes the names from the header line and parses the remaining lines
+        in one go as text, each column is then cast to bool, int, float or
+        kept as text whichever fits first
+    """
+    names = _readnames(fileobj)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        data = loadtxt(fileobj, dtype=str, delimiter=DEFAULT_DELIMITER,
+                       comments=None, ndmin=2)
+    if data.size:
+        if data.shape[1] != len(names):
+            raise ValueError('expected {n} columns as in the header, '
+                             'got {m}'.format(n=len(names), m=data.shape[1]))
+        cols = list(data.T)
+    else:
+        cols = [empty(0, dtype=str) for n in names]
+    return _torecords(names, cols)
+
+
+def _readframe(fileobj):
+    """ same as _loadrecords but parsed by pandas, cells are read as raw text
+        so that columns get cast the same way """
+    names = _readnames(fileobj)
+    frame = read_csv(fileobj, sep=DEFAULT_DELIMITER, header=None,
+                     quoting=QUOTE_NONE, dtype=str, na_filter=False)
+    if frame.shape[1] != len(names):
+        raise ValueError('expected {n} columns as in the header, '
+                         'got {m}'.format(n=len(names), m=frame.shape[1]))
+    cols = [asarray(frame[i].values, dtype=str) for i in frame.columns]
+    return _torecords(names, cols)
+
+
+def _readnames(fileobj):
+    names = fileobj.readline().rstrip('\r\n').split(DEFAULT_DELIMITER)
+    if not any(names):
+        raise IndexError('no header line to read names from')
+    if len(set(names)) != len(names):
+        raise ValueError('duplicate names in header: ' + ', '.join(names))
+    return names
+
+
+def _torecords(names, cols):
+    return fromarrays([_astype_inferred(col) for col in cols], names=names)
+
+
+def _astype_inferred(col):
+    """ casts a text column to bool, int or float like genfromtxt would,
+        otherwise narrows it to its longest cell """
+    if not col.size:
+        return col
+    col = col.copy()  # casting a strided view does not reject empty cells
+    if not (col == '').any():
+        upper = char.upper(col)
+        if ((upper == 'TRUE') | (upper == 'FALSE')).all():
+            return upper == 'TRUE'
+        for dtype in (int, float):
+            try:
+                return col.astype(dtype)
+            except (ValueError, OverflowError):
+                pass
+    width = max(char.str_len(col).max(), 1)
+    return col.astype('{k}{w}'.format(k=col.dtype.kind, w=width))
+
+
+def _remaining_size(fileobj):
+    """ number of bytes left to read in fileobj, 0 if it cannot be told """
+    try:
+        return os.fstat(fileobj.fileno()).st_size - fileobj.tell()
+    except (AttributeError, IOError, OSError, ValueError):
+        return 0
+
+
 def isfileobj(obj):
-    """ checks whether obj is a fileobject """
-    return isinstance(obj, file) or isinstance(obj, _TemporaryFileWrapper)
+    """ checks whether obj is a fileobject, i.e. anything that reads lines
+
+    >>> import tempfile as tf
+    >>> isfileobj(tf.TemporaryFile())
+    True
+    >>> isfileobj([1, 2])
+    False
+    """
+    return hasattr(obj, 'read') and hasattr(obj, 'readline')
 
 
 if __name__ == '__main__':